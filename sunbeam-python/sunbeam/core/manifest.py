@@ -13,7 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
+import functools
 import logging
 from pathlib import Path
 from typing import Any
@@ -23,7 +23,6 @@ import yaml
 from pydantic import Field
 from snaphelpers import Snap
 
-from sunbeam import utils
 from sunbeam.clusterd.client import Client
 from sunbeam.clusterd.service import (
     ClusterServiceUnavailableException,
@@ -42,11 +41,68 @@ from sunbeam.versions import MANIFEST_CHARM_VERSIONS, TERRAFORM_DIR_NAMES
 LOG = logging.getLogger(__name__)
 EMPTY_MANIFEST: dict[str, dict] = {"charms": {}, "terraform": {}}
 
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper  # type: ignore
+    from yaml import SafeLoader as _YamlLoader  # type: ignore
+
+
+@functools.cache
+def _log_yaml_backend() -> None:
+    """Log once when libyaml is missing and pure python yaml is used."""
+    if not yaml.__with_libyaml__:
+        LOG.debug("libyaml not available, falling back to pure python yaml")
+
+
+def _load_yaml(stream: Any) -> Any:
+    """Safe load yaml, using libyaml when available."""
+    _log_yaml_backend()
+    return yaml.load(stream, Loader=_YamlLoader)
+
+
+@functools.cache
+def _get_snap() -> Snap:
+    """Return the snap, created on first use as it needs the snap environment."""
+    return Snap()
+
 
 def embedded_manifest_path(snap: Snap, risk: str) -> Path:
     return snap.paths.snap / "etc" / "manifests" / f"{risk}.yml"
 
 
+@functools.lru_cache(maxsize=4)
+def _load_embedded_manifest(path: Path, mtime: float) -> dict:
+    """Load embedded manifest, cached per path and modification time.
+
+    The returned dict is shared by every caller and must not be modified.
+    """
+    return _load_yaml(path.read_bytes())
+
+
+def _dump_manifest(content: dict | None) -> str:
+    """Dump manifest content in the canonical form stored in cluster db."""
+    _log_yaml_backend()
+    return yaml.dump(
+        content, Dumper=_YamlDumper, sort_keys=True, default_flow_style=False
+    )
+
+
+def _merge(a: Any, b: Any) -> Any:
+    """Return a merged version of a and b, recursing when both are dicts.
+
+    Same semantics as utils.merge_dict without mutating either side, only
+    the dicts along merged paths are copied, other values are shared.
+    """
+    if not isinstance(a, dict) or not isinstance(b, dict):
+        return b if b or not a else a
+    out = dict(a)
+    for key, value in b.items():
+        out[key] = _merge(out[key], value) if key in out else value
+    return out
+
+
 class JujuManifest(pydantic.BaseModel):
     # Setting Field alias not supported in pydantic 1.10.0
     # Old version of pydantic is used due to dependencies
@@ -97,57 +153,64 @@ class SoftwareConfig(pydantic.BaseModel):
     def get_default(
         cls, feature_softwares: dict[str, "SoftwareConfig"] | None = None
     ) -> "SoftwareConfig":
-        """Load default software config."""
-        # TODO(gboutry): Remove Snap instanciation
-        snap = Snap()
+        """Load default software config.
+
+        Defaults are built from trusted in-tree values, validation is skipped.
+        """
+        snap = _get_snap()
         charms = {
-            charm: CharmManifest(channel=channel)
+            charm: CharmManifest.model_construct(channel=channel)
             for charm, channel in MANIFEST_CHARM_VERSIONS.items()
         }
         terraform = {
-            tfplan: TerraformManifest(source=Path(snap.paths.snap / "etc" / tfplan_dir))
+            tfplan: TerraformManifest.model_construct(
+                source=Path(snap.paths.snap / "etc" / tfplan_dir)
+            )
             for tfplan, tfplan_dir in TERRAFORM_DIR_NAMES.items()
         }
         if feature_softwares is None:
             LOG.debug("No features provided, skipping")
-            return SoftwareConfig(charms=charms, terraform=terraform)
+            return SoftwareConfig.model_construct(charms=charms, terraform=terraform)
 
-        extra = {}
+        extra: dict[str, Any] = {}
         for feature, software in feature_softwares.items():
-            for charm, charm_manifest in software.charms.items():
-                if charm in charms:
-                    raise ValueError(f"Feature {feature} overrides charm {charm}")
-                charms[charm] = charm_manifest
-            for tfplan, tf_manifest in software.terraform.items():
-                if tfplan in terraform:
-                    raise ValueError(f"Feature {feature} overrides tfplan {tfplan}")
-                terraform[tfplan] = tf_manifest
-            for key in software.extra:
-                if key in extra:
-                    raise ValueError(f"Feature {feature} overrides extra key {key}")
-                extra[key] = software.extra[key]
-
-        return SoftwareConfig(charms=charms, terraform=terraform, **extra)
+            if collisions := software.charms.keys() & charms.keys():
+                raise ValueError(
+                    f"Feature {feature} overrides charms {sorted(collisions)}"
+                )
+            charms |= software.charms
+            if collisions := software.terraform.keys() & terraform.keys():
+                raise ValueError(
+                    f"Feature {feature} overrides tfplans {sorted(collisions)}"
+                )
+            terraform |= software.terraform
+            if collisions := software.extra.keys() & extra.keys():
+                raise ValueError(
+                    f"Feature {feature} overrides extra keys {sorted(collisions)}"
+                )
+            extra |= software.extra
+
+        return SoftwareConfig.model_construct(
+            charms=charms, terraform=terraform, **extra
+        )
 
     def validate_terraform_keys(self, default_software_config: "SoftwareConfig"):
         """Validate the terraform keys provided are expected."""
-        if self.terraform:
-            tf_keys = set(self.terraform.keys())
-            all_tfplans = default_software_config.terraform.keys()
-            if not tf_keys <= all_tfplans:
-                raise ValueError(
-                    f"Manifest Software Terraform keys should be one of {all_tfplans} "
-                )
+        all_tfplans = default_software_config.terraform.keys()
+        if unknown := self.terraform.keys() - all_tfplans:
+            raise ValueError(
+                f"Manifest Software Terraform keys should be one of {all_tfplans}, "
+                f"got {sorted(unknown)}"
+            )
 
     def validate_charm_keys(self, default_software_config: "SoftwareConfig"):
         """Validate the charm keys provided are expected."""
-        if self.charms:
-            charms_keys = set(self.charms.keys())
-            all_charms = default_software_config.charms.keys()
-            if not charms_keys <= all_charms:
-                raise ValueError(
-                    f"Manifest Software charms keys should be one of {all_charms} "
-                )
+        all_charms = default_software_config.charms.keys()
+        if unknown := self.charms.keys() - all_charms:
+            raise ValueError(
+                f"Manifest Software charms keys should be one of {all_charms}, "
+                f"got {sorted(unknown)}"
+            )
 
     def validate_against_default(
         self, default_software_config: "SoftwareConfig"
@@ -158,16 +221,16 @@ class SoftwareConfig(pydantic.BaseModel):
 
     def merge(self, other: "SoftwareConfig") -> "SoftwareConfig":
         """Return a merged version of the software config."""
-        juju = JujuManifest(
-            **utils.merge_dict(self.juju.model_dump(), other.juju.model_dump())
-        )
-        charms: dict[str, CharmManifest] = utils.merge_dict(
-            copy.deepcopy(self.charms), copy.deepcopy(other.charms)
+        # Both sides are already validated, other overrides when non empty
+        juju = JujuManifest.model_construct(
+            bootstrap_args=list(other.juju.bootstrap_args or self.juju.bootstrap_args),
+            scale_args=list(other.juju.scale_args or self.juju.scale_args),
         )
-        terraform: dict[str, TerraformManifest] = utils.merge_dict(
-            copy.deepcopy(self.terraform), copy.deepcopy(other.terraform)
+        charms: dict[str, CharmManifest] = _merge(self.charms, other.charms)
+        terraform: dict[str, TerraformManifest] = _merge(
+            self.terraform, other.terraform
         )
-        extra = utils.merge_dict(copy.deepcopy(self.extra), copy.deepcopy(other.extra))
+        extra = _merge(self.extra, other.extra)
         return SoftwareConfig(juju=juju, charms=charms, terraform=terraform, **extra)
 
     @property
@@ -194,14 +257,12 @@ class Manifest(pydantic.BaseModel):
     @classmethod
     def from_file(cls, file: Path) -> "Manifest":
         """Load manifest from file."""
-        with file.open() as f:
-            return Manifest.model_validate(yaml.safe_load(f))
+        with file.open("rb") as f:
+            return Manifest.model_validate(_load_yaml(f))
 
     def merge(self, other: "Manifest") -> "Manifest":
         """Merge the manifest with the provided manifest."""
-        deployment = utils.merge_dict(
-            copy.deepcopy(self.deployment), copy.deepcopy(other.deployment)
-        )
+        deployment = _merge(self.deployment, other.deployment)
         software = self.software.merge(other.software)
 
         return Manifest(deployment=deployment, software=software)
@@ -222,6 +283,7 @@ class AddManifestStep(BaseStep):
     """
 
     manifest_content: dict[str, dict] | None
+    _manifest_yaml: str | None
 
     def __init__(
         self,
@@ -234,18 +296,16 @@ class AddManifestStep(BaseStep):
         self.manifest_file = manifest_file
         self.clear = clear
         self.manifest_content = None
-        self.snap = Snap()
+        self._manifest_yaml = None
+        self.snap = _get_snap()
 
     def is_skip(self, status: Status | None = None) -> Result:
         """Skip if the user provided manifest and the latest from db are same."""
         risk = infer_risk(self.snap)
         try:
-            embedded_manifest = yaml.safe_load(
-                embedded_manifest_path(self.snap, risk).read_bytes()
-            )
             if self.manifest_file:
-                with self.manifest_file.open("r") as file:
-                    self.manifest_content = yaml.safe_load(file)
+                with self.manifest_file.open("rb") as file:
+                    self.manifest_content = _load_yaml(file)
             elif self.clear:
                 self.manifest_content = EMPTY_MANIFEST
         except (yaml.YAMLError, IOError) as e:
@@ -261,8 +321,15 @@ class AddManifestStep(BaseStep):
                     # only save risk manifest when not stable,
                     # and no manifest was found in db
                     return Result(ResultType.SKIPPED)
-                else:
-                    self.manifest_content = embedded_manifest
+                try:
+                    embedded_path = embedded_manifest_path(self.snap, risk)
+                    # Shared cached dict, manifest_content is only read from here
+                    self.manifest_content = _load_embedded_manifest(
+                        embedded_path, embedded_path.stat().st_mtime
+                    )
+                except (yaml.YAMLError, IOError) as e:
+                    LOG.debug("Failed to load embedded manifest", exc_info=True)
+                    return Result(ResultType.FAILED, str(e))
         except ClusterServiceUnavailableException as e:
             LOG.debug("Failed to fetch latest manifest from clusterd", exc_info=True)
             return Result(ResultType.FAILED, str(e))
@@ -270,20 +337,24 @@ class AddManifestStep(BaseStep):
         if self.manifest_content is None:
             return Result(ResultType.SKIPPED)
 
-        if (
-            latest_manifest
-            and yaml.safe_load(latest_manifest.get("data", {})) == self.manifest_content
-        ):
-            return Result(ResultType.SKIPPED)
+        # Dumped once, reused by run to write the manifest
+        self._manifest_yaml = _dump_manifest(self.manifest_content)
+        if latest_manifest:
+            latest_data = latest_manifest.get("data", {})
+            if latest_data == self._manifest_yaml:
+                return Result(ResultType.SKIPPED)
+            # Rows written in a non canonical form need a full comparison
+            if _load_yaml(latest_data) == self.manifest_content:
+                return Result(ResultType.SKIPPED)
 
         return Result(ResultType.COMPLETED)
 
     def run(self, status: Status | None = None) -> Result:
         """Write manifest to cluster db."""
         try:
-            id = self.client.cluster.add_manifest(
-                data=yaml.safe_dump(self.manifest_content)
-            )
+            if self._manifest_yaml is None:
+                self._manifest_yaml = _dump_manifest(self.manifest_content)
+            id = self.client.cluster.add_manifest(data=self._manifest_yaml)
             return Result(ResultType.COMPLETED, id)
         except Exception as e:
             LOG.debug(e)
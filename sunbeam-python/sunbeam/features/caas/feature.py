@@ -14,12 +14,13 @@
 # limitations under the License.
 
 import logging
+import types
+import typing
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 
 import click
 from packaging.version import Version
-from pydantic import Field
-from pydantic.dataclasses import dataclass
 from rich.console import Console
 from rich.status import Status
 
@@ -52,19 +53,36 @@ LOG = logging.getLogger(__name__)
 console = Console()
 
 
-@dataclass
+@dataclass(slots=True)
 class CaasConfig:
-    image_name: str | None = Field(default=None, description="CAAS Image name")
-    image_url: str | None = Field(
-        default=None, description="CAAS Image URL to upload to glance"
-    )
-    container_format: str | None = Field(
-        default=None, description="Image container format"
-    )
-    disk_format: str | None = Field(default=None, description="Image disk format")
-    properties: dict = Field(
-        default={}, description="Properties to set for image in glance"
-    )
+    """CAAS image configuration, passed as is to terraform."""
+
+    # CAAS Image name
+    image_name: str | None = None
+    # CAAS Image URL to upload to glance
+    image_url: str | None = None
+    # Image container format
+    container_format: str | None = None
+    # Image disk format
+    disk_format: str | None = None
+    # Properties to set for image in glance
+    properties: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        """Check values against the field annotations.
+
+        caas_config comes from the user manifest as is, nothing else validates it.
+        """
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(f.type, types.UnionType):
+                allowed = typing.get_args(f.type)
+            else:
+                allowed = (f.type,)
+            if not isinstance(value, tuple(typing.get_origin(t) or t for t in allowed)):
+                raise ValueError(
+                    f"Invalid caas_config {f.name}, expected {f.type}: {value!r}"
+                )
 
 
 class CaasConfigureStep(BaseStep):
@@ -90,21 +108,16 @@ class CaasConfigureStep(BaseStep):
         """Execute configuration using terraform."""
         try:
             override_tfvars = {}
-            try:
-                manifest_caas_config = self.manifest.software.extra[
-                    "caas_config"
-                ].model_dump()
-                for caas_config_attribute, tfvar_name in self.tfhelper.tfvar_map.get(
-                    "caas_config", {}
-                ).items():
-                    caas_config_attribute_ = manifest_caas_config.get(
-                        caas_config_attribute
-                    )
-                    if caas_config_attribute_:
-                        override_tfvars[tfvar_name] = caas_config_attribute_
-            except AttributeError:
-                # caas_config not defined in manifest, ignore
-                pass
+            # caas_config not defined in manifest resolves every attribute to None
+            manifest_caas_config = self.manifest.software.extra.get("caas_config")
+            for caas_config_attribute, tfvar_name in self.tfhelper.tfvar_map.get(
+                "caas_config", {}
+            ).items():
+                caas_config_attribute_ = getattr(
+                    manifest_caas_config, caas_config_attribute, None
+                )
+                if caas_config_attribute_:
+                    override_tfvars[tfvar_name] = caas_config_attribute_
 
             self.tfhelper.update_tfvars_and_apply_tf(
                 self.client, self.manifest, override_tfvars=override_tfvars
@@ -176,7 +189,12 @@ class CaasFeature(OpenStackControlPlaneFeature):
             # Already instanciation of the schema, nothing to do
             return
         elif isinstance(caas_config, dict):
-            software_config.extra["caas_config"] = CaasConfig(**caas_config)
+            try:
+                software_config.extra["caas_config"] = CaasConfig(**caas_config)
+            except TypeError as e:
+                raise ValueError(
+                    f"Invalid caas_config in manifest: {caas_config!r}"
+                ) from e
         else:
             raise ValueError(f"Invalid caas_config in manifest: {caas_config!r}")
 
@@ -18,6 +18,15 @@ from unittest.mock import MagicMock, patch
 import pytest
 from snaphelpers import Snap, SnapConfig, SnapServices
 
+import sunbeam.core.manifest as manifest_mod
+
+
+@pytest.fixture(autouse=True)
+def reset_manifest_snap():
+    """Drop the snap cached by the manifest module between tests."""
+    manifest_mod._get_snap.cache_clear()
+    yield
+
 
 @pytest.fixture
 def snap_env(tmp_path: Path, mocker):
@@ -92,6 +92,20 @@ def snap_risk(snap, mocker):
 
 
 class TestSoftwareConfig:
+    def test_get_default_matches_validated(self, mocker, snap):
+        mocker.patch.object(manifest_mod, "Snap", return_value=snap)
+        feature_software = manifest_mod.SoftwareConfig(
+            charms={"my-charm": manifest_mod.CharmManifest(channel="37")},
+            my_feature={"enabled": True},
+        )
+        result = manifest_mod.SoftwareConfig.get_default(
+            {"my-feature": feature_software}
+        )
+        validated = manifest_mod.SoftwareConfig.model_validate(result.model_dump())
+        assert result == validated
+        assert result.charms["my-charm"].channel == "37"
+        assert result.extra == {"my_feature": {"enabled": True}}
+
     def test_merge(self):
         config1 = manifest_mod.SoftwareConfig(
             charms={"my-charm-1": manifest_mod.CharmManifest()}
@@ -105,6 +119,66 @@ class TestSoftwareConfig:
             "my-charm-2": manifest_mod.CharmManifest(channel="37"),
         }
 
+    def test_merge_juju(self):
+        config1 = manifest_mod.SoftwareConfig(
+            juju=manifest_mod.JujuManifest(
+                bootstrap_args=["--debug"], scale_args=["-n", "3"]
+            )
+        )
+        config2 = manifest_mod.SoftwareConfig(
+            juju=manifest_mod.JujuManifest(bootstrap_args=["--agent-version=3.5"])
+        )
+        result = config1.merge(config2)
+        assert result.juju == manifest_mod.JujuManifest(
+            bootstrap_args=["--agent-version=3.5"], scale_args=["-n", "3"]
+        )
+
+    def test_merge_nested_extra(self):
+        config1 = manifest_mod.SoftwareConfig(
+            feature={"a": {"b": 1, "c": 2}}, other={"d": 3}
+        )
+        config2 = manifest_mod.SoftwareConfig(feature={"a": {"c": 4}})
+        result = config1.merge(config2)
+        assert result.extra == {"feature": {"a": {"b": 1, "c": 4}}, "other": {"d": 3}}
+        # Sources are left untouched
+        assert config1.extra == {"feature": {"a": {"b": 1, "c": 2}}, "other": {"d": 3}}
+        assert config2.extra == {"feature": {"a": {"c": 4}}}
+
+    def test_get_default_feature_overrides_charm(self, mocker, snap):
+        mocker.patch.object(manifest_mod, "Snap", return_value=snap)
+        feature_software = manifest_mod.SoftwareConfig(
+            charms={"keystone-k8s": manifest_mod.CharmManifest(channel="37")}
+        )
+        with pytest.raises(ValueError, match=r"overrides charms \['keystone-k8s'\]"):
+            manifest_mod.SoftwareConfig.get_default({"my-feature": feature_software})
+
+    def test_get_default_features_override_extra(self, mocker, snap):
+        mocker.patch.object(manifest_mod, "Snap", return_value=snap)
+        feature_softwares = {
+            "feature-1": manifest_mod.SoftwareConfig(shared={}),
+            "feature-2": manifest_mod.SoftwareConfig(shared={}),
+        }
+        with pytest.raises(ValueError, match="feature-2 overrides extra keys"):
+            manifest_mod.SoftwareConfig.get_default(feature_softwares)
+
+    def test_get_default_not_shared(self, mocker, snap):
+        mocker.patch.object(manifest_mod, "Snap", return_value=snap)
+        feature_software = manifest_mod.SoftwareConfig(
+            charms={"my-charm": manifest_mod.CharmManifest(channel="37")}
+        )
+        result1 = manifest_mod.SoftwareConfig.get_default(
+            {"my-feature": feature_software}
+        )
+        result1.charms["keystone-k8s"].channel = "fake/edge"
+        result1.charms["keystone-k8s"].config = {"debug": True}
+        result2 = manifest_mod.SoftwareConfig.get_default()
+
+        assert "my-charm" in result1.charms
+        # Changes to a returned config must not leak into later defaults
+        assert "my-charm" not in result2.charms
+        assert result2.charms["keystone-k8s"].channel != "fake/edge"
+        assert result2.charms["keystone-k8s"].config is None
+
 
 class TestManifest:
     def test_merge(self):
@@ -122,6 +196,29 @@ class TestManifest:
         result = manifest_mod.Manifest.merge(manifest1, manifest2)
         assert result.software == software_merged
 
+    def test_merge_deployment(self):
+        manifest1 = manifest_mod.Manifest(
+            deployment={"bootstrap": {"management_cidr": "10.0.0.0/24"}, "a": 1}
+        )
+        manifest2 = manifest_mod.Manifest(
+            deployment={"bootstrap": {"management_cidr": ""}, "b": {"c": 2}}
+        )
+        result = manifest1.merge(manifest2)
+        # Empty values do not override existing ones
+        assert result.deployment == {
+            "bootstrap": {"management_cidr": "10.0.0.0/24"},
+            "a": 1,
+            "b": {"c": 2},
+        }
+        assert manifest1.deployment == {
+            "bootstrap": {"management_cidr": "10.0.0.0/24"},
+            "a": 1,
+        }
+        assert manifest2.deployment == {
+            "bootstrap": {"management_cidr": ""},
+            "b": {"c": 2},
+        }
+
     def test_load(self, mocker, snap, tmpdir):
         mocker.patch.object(manifest_mod, "Snap", return_value=snap)
         manifest_file = tmpdir.mkdir("manifests").join("test_manifest.yaml")
@@ -159,7 +256,7 @@ class TestManifest:
         manifest_ = manifest_mod.Manifest.model_validate(
             test_manifest_incorrect_terraform_key
         )
-        with pytest.raises(ValueError):
+        with pytest.raises(ValueError, match=r"got \['fake-plan'\]"):
             manifest_.validate_against_default(
                 manifest_mod.Manifest(
                     software=manifest_mod.SoftwareConfig(
@@ -173,6 +270,20 @@ class TestManifest:
             )
 
 
+class TestYamlBackend:
+    def test_missing_libyaml_logged_once(self, mocker, caplog):
+        mocker.patch.object(manifest_mod.yaml, "__with_libyaml__", False)
+        manifest_mod._log_yaml_backend.cache_clear()
+        with caplog.at_level("DEBUG", logger=manifest_mod.LOG.name):
+            manifest_mod._load_yaml("charms: {}")
+            manifest_mod._dump_manifest(manifest_mod.EMPTY_MANIFEST)
+        manifest_mod._log_yaml_backend.cache_clear()
+
+        assert [r.message for r in caplog.records].count(
+            "libyaml not available, falling back to pure python yaml"
+        ) == 1
+
+
 @pytest.fixture
 def edge_manifest(mocker, snap_risk):
     edge_manifest = snap_risk.paths.snap / "etc" / "manifests" / "edge.yml"
@@ -226,6 +337,20 @@ class TestAddManifestStep:
 
         assert result.result_type == ResultType.SKIPPED
 
+    def test_is_skip_clear_canonical_manifest_in_db(
+        self, mocker, snap_risk, edge_manifest
+    ):
+        # Manifest in cluster DB stored in canonical form, no parsing needed
+        empty_manifest_str = yaml.safe_dump(manifest_mod.EMPTY_MANIFEST)
+        client = Mock()
+        client.cluster.get_latest_manifest.return_value = {"data": empty_manifest_str}
+        step = manifest_mod.AddManifestStep(client, clear=True)
+        load = mocker.spy(manifest_mod.yaml, "load")
+        result = step.is_skip()
+
+        assert all(c.args[0] != empty_manifest_str for c in load.call_args_list)
+        assert result.result_type == ResultType.SKIPPED
+
     def test_is_skip_no_connection_to_clusterdb(self, snap_risk, edge_manifest):
         client = Mock()
         client.cluster.get_latest_manifest.side_effect = (
@@ -258,6 +383,45 @@ class TestAddManifestStep:
         manifest_mod.embedded_manifest_path.assert_called_once_with(snap_risk, "edge")
         assert result.result_type == ResultType.COMPLETED
 
+    def test_is_skip_manifest_in_db_embedded_not_loaded(self, snap_risk, edge_manifest):
+        snap_risk.config.get.side_effect = lambda key: "edge"
+        client = Mock()
+        client.cluster.get_latest_manifest.return_value = {"data": test_manifest}
+        step = manifest_mod.AddManifestStep(client)
+        result = step.is_skip()
+
+        manifest_mod.embedded_manifest_path.assert_not_called()
+        assert result.result_type == ResultType.SKIPPED
+
+    def test_is_skip_embedded_manifest_missing(self, snap_risk, edge_manifest):
+        snap_risk.config.get.side_effect = lambda key: "edge"
+        manifest_mod.embedded_manifest_path.return_value.unlink()
+        client = Mock()
+        client.cluster.get_latest_manifest.side_effect = ManifestItemNotFoundException(
+            "Manifest Item not found."
+        )
+        step = manifest_mod.AddManifestStep(client)
+        result = step.is_skip()
+
+        assert result.result_type == ResultType.FAILED
+
+    def test_is_skip_embedded_manifest_loaded_once(
+        self, mocker, snap_risk, edge_manifest
+    ):
+        snap_risk.config.get.side_effect = lambda key: "edge"
+        client = Mock()
+        client.cluster.get_latest_manifest.side_effect = ManifestItemNotFoundException(
+            "Manifest Item not found."
+        )
+        load = mocker.spy(manifest_mod.yaml, "load")
+        manifest_mod._load_embedded_manifest.cache_clear()
+        for _ in range(2):
+            step = manifest_mod.AddManifestStep(client)
+            result = step.is_skip()
+            assert result.result_type == ResultType.COMPLETED
+
+        assert load.call_count == 1
+
     def test_run(self, tmpdir, snap_risk, edge_manifest):
         client = Mock()
         client.cluster.get_latest_manifest.return_value = {"data": "charms: {}"}
@@ -272,6 +436,22 @@ class TestAddManifestStep:
         )
         assert result.result_type == ResultType.COMPLETED
 
+    def test_run_reuses_is_skip_dump(self, mocker, tmpdir, snap_risk, edge_manifest):
+        client = Mock()
+        client.cluster.get_latest_manifest.return_value = {"data": "charms: {}"}
+        manifest_file = tmpdir.mkdir("manifests").join("test_manifest.yaml")
+        manifest_file.write(test_manifest)
+        step = manifest_mod.AddManifestStep(client, manifest_file)
+        dump = mocker.spy(manifest_mod, "_dump_manifest")
+        assert step.is_skip().result_type == ResultType.COMPLETED
+        result = step.run()
+
+        dump.assert_called_once()
+        client.cluster.add_manifest.assert_called_once_with(
+            data=yaml.safe_dump(yaml.safe_load(test_manifest))
+        )
+        assert result.result_type == ResultType.COMPLETED
+
     def test_run_with_no_manifest(self, snap_risk, edge_manifest):
         client = Mock()
         step = manifest_mod.AddManifestStep(client)
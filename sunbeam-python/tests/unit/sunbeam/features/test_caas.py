@@ -0,0 +1,139 @@
+# Copyright (c) 2024 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from sunbeam.core.common import ResultType
+from sunbeam.core.feature import FeatureManager
+from sunbeam.core.manifest import Manifest, SoftwareConfig
+from sunbeam.core.terraform import TerraformException
+from sunbeam.features.caas.feature import CaasConfig, CaasConfigureStep, CaasFeature
+from sunbeam.features.dns.feature import DnsFeature
+
+
+class TestCaasConfigureStep:
+    def setup_method(self):
+        self.client = Mock()
+        self.tfhelper = Mock()
+        self.tfhelper.tfvar_map = {
+            "caas_config": {
+                "image_name": "image-name",
+                "image_url": "image-source-url",
+                "container_format": "image-container-format",
+                "disk_format": "image-disk-format",
+                "properties": "image-properties",
+            }
+        }
+
+    def _manifest(self, **extra) -> Manifest:
+        return Manifest(software=SoftwareConfig(**extra))
+
+    def test_run(self):
+        manifest = self._manifest(
+            caas_config=CaasConfig(image_name="k8s", properties={"os": "ubuntu"})
+        )
+        step = CaasConfigureStep(self.client, self.tfhelper, manifest, {})
+        result = step.run()
+
+        self.tfhelper.update_tfvars_and_apply_tf.assert_called_once_with(
+            self.client,
+            manifest,
+            override_tfvars={
+                "image-name": "k8s",
+                "image-properties": {"os": "ubuntu"},
+            },
+        )
+        assert result.result_type == ResultType.COMPLETED
+
+    def test_run_no_caas_config(self):
+        manifest = self._manifest()
+        step = CaasConfigureStep(self.client, self.tfhelper, manifest, {})
+        result = step.run()
+
+        self.tfhelper.update_tfvars_and_apply_tf.assert_called_once_with(
+            self.client, manifest, override_tfvars={}
+        )
+        assert result.result_type == ResultType.COMPLETED
+
+    def test_run_tf_apply_failed(self):
+        self.tfhelper.update_tfvars_and_apply_tf.side_effect = TerraformException(
+            "apply failed..."
+        )
+        manifest = self._manifest(caas_config=CaasConfig())
+        step = CaasConfigureStep(self.client, self.tfhelper, manifest, {})
+        result = step.run()
+
+        assert result.result_type == ResultType.FAILED
+        assert result.message == "apply failed..."
+
+
+class TestCaasFeature:
+    def setup_method(self):
+        self.feature = CaasFeature.__new__(CaasFeature)
+
+    def test_add_manifest_section_default(self):
+        software_config = SoftwareConfig()
+        self.feature.add_manifest_section(software_config)
+
+        assert software_config.extra["caas_config"] == CaasConfig()
+
+    def test_add_manifest_section_from_dict(self):
+        software_config = SoftwareConfig(caas_config={"image_name": "k8s"})
+        self.feature.add_manifest_section(software_config)
+
+        assert software_config.extra["caas_config"] == CaasConfig(image_name="k8s")
+
+    @pytest.mark.parametrize("value", ["k8s", 1])
+    def test_add_manifest_section_unknown_key(self, value):
+        software_config = SoftwareConfig(caas_config={"fake_key": value})
+        with pytest.raises(ValueError, match="Invalid caas_config in manifest"):
+            self.feature.add_manifest_section(software_config)
+
+    @pytest.mark.parametrize(
+        "caas_config",
+        [
+            {"properties": "foo"},
+            {"properties": ["os", "ubuntu"]},
+            {"properties": None},
+            {"image_url": 123},
+            {"image_name": ["k8s"]},
+        ],
+    )
+    def test_add_manifest_section_invalid_type(self, caas_config):
+        software_config = SoftwareConfig(caas_config=caas_config)
+        key = next(iter(caas_config))
+        with pytest.raises(ValueError, match=f"Invalid caas_config {key}, expected"):
+            self.feature.add_manifest_section(software_config)
+
+    def test_manifest_tfvar_map_merge(self, snap_env):
+        deployment = Mock()
+        with patch.object(
+            FeatureManager,
+            "get_all_feature_classes",
+            return_value=[CaasFeature, DnsFeature],
+        ):
+            tfvar_map = FeatureManager.get_all_feature_manifest_tfvar_map(deployment)
+
+        assert tfvar_map["openstack-plan"]["charms"].keys() == {
+            "magnum-k8s",
+            "designate-k8s",
+            "designate-bind-k8s",
+        }
+        # Merged map must not share state with later feature maps
+        tfvar_map["caas-setup"]["caas_config"]["image_name"] = "fake-var"
+        feature = CaasFeature(deployment)
+        caas_map = feature.manifest_attributes_tfvar_map()
+        assert caas_map["caas-setup"]["caas_config"]["image_name"] == "image-name"